@@ -37,10 +37,22 @@ True
 True
 """
 
-import random, json, os, sys, tarfile
+import random, json, os, sys, tarfile, functools, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import snappy
 import word_problem
-import networkx as nx
+
+# orjson is considerably faster when scanning many proofs, but is
+# entirely optional.
+try:
+    from orjson import loads as load_json
+except ImportError:
+    load_json = json.loads
+
+# Whether check_proof should confirm that the stored presentation
+# matches the one SnapPy gives.  This is not needed for the validity
+# of the proof, so it is off by default.
+verify_metadata = False
 
 # The example from the top of this file
 sample1 = json.loads(sys.modules[__name__].__doc__.split('\n\n')[1])
@@ -49,117 +61,182 @@ def invert_word(word):
     return word.swapcase()[::-1]
 
 def paths_to_root(claims):
-    return [c[0] for c in claims]
+    return (c[0] for c in claims)
+
+def parse_claims(claims):
+    """
+    Converts the raw "proof" data into triples consisting of the path
+    to the root, the set of edge labels on that path, and the trivial
+    word at the leaf.
+    """
+    ans = []
+    for a, b in claims:
+        path_to_root = tuple(a.split('.'))
+        ans.append((path_to_root, frozenset(path_to_root), tuple(b.split('.'))))
+    return ans
 
 def build_graph(claims):
     """
     Given a list of claims corresponding to the leaves of a
-    nonordering proof tree, build the tree itself as a graph.
+    nonordering proof tree, build the tree itself as a dictionary
+    taking each vertex to a dictionary of its children keyed by edge
+    label.  The vertices are numbered in the order they are created,
+    starting with the root as 0.  The root is included in the returned
+    list of leaves, as it has valence one.
     """
     paths = paths_to_root(claims)
-    T = nx.DiGraph()
-    T.add_node('1')
-    leaves = ['1']
+    children = {0:{}}
+    leaves = [0]
     for path in paths:
-        vert = '1'
+        vert = 0
         for g in path:
-            new_vert = vert + '.' + g
-            T.add_edge(vert, new_vert, label=g)
-            vert = new_vert
+            kids = children[vert]
+            if g not in kids:
+                new_vert = len(children)
+                kids[g] = new_vert
+                children[new_vert] = {}
+            vert = kids[g]
         leaves.append(vert)
-    return T, leaves
+    return children, leaves
     
         
-def tree_ok(claims):
+def check_claim(solver, claim):
+    path_to_root, valid_words, trivial_word = claim
+    if not valid_words.issuperset(trivial_word):
+        return False
+    return solver.is_trivial(''.join(trivial_word))
+
+def check_proof_fused(solver, claims):
     """
     Given a list of claims corresponding to the leaves of a
     nonordering proof tree, checks that the data really defines a
-    directed trivalent tree with a unique root vertex.
+    directed trivalent tree with a unique root vertex whose interior
+    vertices have outgoing edges labelled by inverse words, that every
+    edge label is nontrivial, and that each claim holds.  This is done
+    in a single pass over the claims, building the tree as we go and
+    giving up as soon as anything fails.
+
+    >>> solver = _make_solver('m003(-3,1)', 100, (1, 1, 0))
+    >>> def check(leaves):
+    ...     return check_proof_fused(solver, parse_claims(leaves))
+    >>> leaves = sample1['proof']
+    >>> check(leaves)
+    True
+
+    Each of the following mutations of the above tree is rejected:
+    a repeated leaf, a leaf which is also an interior vertex, sibling
+    edges whose labels are not inverses, a root with two children, and
+    an interior vertex with only one child.
+
+    >>> check(leaves + leaves[:1])
+    False
+    >>> check(leaves + [['a.B', 'a.B']])
+    False
+    >>> check(leaves[:2] + [['a.B.b', 'a.B.b']])
+    False
+    >>> check(leaves + [['A', 'A.a']])
+    False
+    >>> check(leaves[:2])
+    False
     """
-    T, leaves = build_graph(claims)
-
-    # A branching is a directed forest where every vertex has in-degree
-    # a most 1.            
-    if not nx.is_branching(T):
-        return False
-
-    # Now check that the tree is trivalent.
-    degrees = T.degree()
-    leaf_count = 0
-    for v in T.nodes():
-        if v in leaves:
-            if degrees[v] != 1:
-                return False
-            leaf_count += 1
-        else:
-            if degrees[v] != 3:
+    children = {0:{}}
+    leaves = set()
+    # Non-root vertices which so far have only one outgoing edge.
+    unpaired = 0
+    for claim in claims:
+        vert = 0
+        for g in claim[0]:
+            if vert in leaves:
                 return False
-            # Check the outgoing edges of this interior vertex
-            # labelled by inverse words.
-            w0, w1 = [attr['label'] for attr in T.adj[v].values()]
-            if invert_word(w0) != w1:
-                return False
-
-    # Make sure there wasn't any redundancy in the path data.
-    if leaf_count != len(leaves):
-        return False
-
-    # This should be redundant, but might as well check. 
-    paths_from_root = nx.single_source_shortest_path(T, '1')
-    for v, path in paths_from_root.items():
-        for p in path:
-            if not v.startswith(p):
-                return False
-    return True
-    
-def all_nontrivial_edge_labels(solver, claims):
-    edge_labels = set(sum(paths_to_root(claims), []))
-    return all(solver.is_nontrivial(e) for e in edge_labels)
-
-def check_claim(solver, claim):
-    path_to_root, trivial_word = claim
-    is_one = solver.is_trivial(''.join(trivial_word))    
-    valid_words = set(path_to_root)
-    return set(trivial_word).issubset(valid_words) and is_one
+            kids = children[vert]
+            if g not in kids:
+                if len(kids) == 0:
+                    if vert != 0:
+                        unpaired += 1
+                elif vert == 0 or len(kids) == 2:
+                    return False
+                elif invert_word(next(iter(kids))) != g:
+                    return False
+                else:
+                    unpaired -= 1
+                if not solver.is_nontrivial(g):
+                    return False
+                new_vert = len(children)
+                kids[g] = new_vert
+                children[new_vert] = {}
+            vert = kids[g]
+        if vert in leaves or len(children[vert]) > 0:
+            return False
+        leaves.add(vert)
+        if not check_claim(solver, claim):
+            return False
+    return len(children[0]) == 1 and unpaired == 0
+
+@functools.lru_cache(maxsize=128)
+def _make_solver(name, bits_prec, group_args):
+    """
+    Verifying the hyperbolic structure is the most expensive step, so
+    reuse the solver when checking several proofs for one manifold.
+    """
+    M = snappy.Manifold(name)
+    return word_problem.WordProblemSolver(M, bits_prec=bits_prec,
+                                          fundamental_group_args=list(group_args))
 
 def check_proof(proof, bits_prec=100):
     """
     This is the main function for rigorously verifying that a
     nonordering proof tree is valid.  
     """
-    if isinstance(proof, str):
-        proof = json.loads(proof)
-    M = snappy.Manifold(proof['name'])
-    solver = word_problem.WordProblemSolver(M, bits_prec=bits_prec,
-                             fundamental_group_args=proof['group_args'])
+    if isinstance(proof, (str, bytes)):
+        proof = load_json(proof)
+    solver = _make_solver(proof['name'], bits_prec, tuple(proof['group_args']))
 
     # We never actually use these assertions when checking the proof,
     # but it's hard to imagine that we will succeed if they fail.
-    assert solver.rho.generators() == proof['gens'].split('.')
-    assert solver.rho.relators() == proof['rels']
-
-    claims = proof['proof']
-    claims = [(a.split('.'), b.split('.')) for a, b in claims]
-    a0 = tree_ok(claims)
-    if not a0:
-        return False
-    a1 = all_nontrivial_edge_labels(solver, claims)
-    a2 = all(check_claim(solver, c) for c in claims)
-    return a0 and a1 and a2
+    if __debug__ and verify_metadata:
+        assert solver.rho.generators() == proof['gens'].split('.')
+        assert solver.rho.relators() == proof['rels']
+
+    claims = parse_claims(proof['proof'])
+    try:
+        return check_proof_fused(solver, claims)
+    finally:
+        # The solver is cached across proofs, but its word caches
+        # should only last for this one.
+        solver.clear_caches()
+
+def precisions(min_bits, max_bits):
+    """
+    Doubles the precision, with an intermediate step halfway in
+    between each time.
 
-def check_proof_harder(proof, max_bits=1000):
+    >>> list(precisions(100, 1000))
+    [100, 150, 200, 300, 400, 600, 800]
+    """
+    bits = min_bits
+    while bits <= max_bits:
+        yield bits
+        if 3*bits//2 <= max_bits:
+            yield 3*bits//2
+        bits = 2*bits
+
+def check_proof_harder(proof, max_bits=1000, *, min_bits=100):
     """
-    Try to check the given proof at higher and higher precisions until
-    we succeed or pass max_bits precision.
+    Try to check the given proof at higher and higher precisions,
+    starting at min_bits, until we succeed or pass max_bits precision.
+    Most proofs go through at 100 bits and nearly all of the rest at
+    150, so the intermediate steps save trying 200.  On failure,
+    returns (False, max_bits).
     """
-    bits = 100
-    while bits <= 1000:
+    if isinstance(proof, (str, bytes)):
+        proof = load_json(proof)
+    for bits in precisions(min_bits, max_bits):
         try:
             ans = check_proof(proof, bits)
             return ans, bits
         except word_problem.WordProblemError:
-            bits = 2*bits
-    return False, bits
+            pass
+    return False, max_bits
 
 
 # --------------- end core code -----------------
@@ -175,7 +252,7 @@ else:
 def load_proof_by_name(name):
     if not name.startswith('proofs/'):
         name = 'proofs/' + name
-    return json.loads(proof_tarball.extractfile(name).read())
+    return load_json(proof_tarball.extractfile(name).read())
 
 def random_proof():
     proofs = [name for name in proof_tarball.getnames()
@@ -183,6 +260,35 @@ def random_proof():
     return load_proof_by_name(random.choice(proofs))
 
 
+def _check_file(path):
+    try:
+        with open(path, 'rb') as file:
+            proof = load_json(file.read())
+        success, bits_prec = check_proof_harder(proof)
+        return os.path.basename(path), (success, bits_prec, None)
+    except Exception as error:
+        return os.path.basename(path), (False, None, repr(error))
+
+def check_proof_directory(dir, processes=None):
+    """
+    Runs check_proof_harder on every proof in the given directory,
+    spread over the given number of processes (default: one per
+    core).  Returns a dictionary taking each file name to the triple
+    (success, bits_prec, error), where error is None unless checking
+    that file raised an exception, in which case the triple is
+    (False, None, repr(exception)); one bad file does not lose the
+    results for the others.  The workers are started
+    with "spawn" as SnapPy and Sage do not always survive a fork.
+    """
+    files = [os.path.join(dir, f) for f in sorted(os.listdir(dir))
+             if not f.startswith('.')]
+    if processes is None:
+        processes = os.cpu_count()
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+        return dict(executor.map(_check_file, files, chunksize=4))
+
+
 def proof_sizes():
     """
     Used to gather statistics for the paper
@@ -195,11 +301,10 @@ def proof_sizes():
     max_trivial_word = 0    
     
     for f in os.listdir(dir):
-        proof = json.loads(open(dir + f).read())
-        claims = proof['proof']
-        claims = [(a.split('.'), b.split('.')) for a, b in claims]
-        T, leaves = build_graph(claims)
-        e = T.number_of_edges()
+        proof = load_json(open(dir + f, 'rb').read())
+        claims = parse_claims(proof['proof'])
+        children, leaves = build_graph(claims)
+        e = sum(len(kids) for kids in children.values())
         l = len(leaves)
         num_edges.append(e)
         num_leaves.append(l)
@@ -212,7 +317,7 @@ def proof_sizes():
             max_leaves = l
             print('leaves', l, f)
 
-        trivial_words_lengths = [len(c[1]) for c in claims]
+        trivial_words_lengths = [len(c[2]) for c in claims]
         if max(trivial_words_lengths) > max_trivial_word:
             max_trivial_word = max(trivial_words_lengths)
             print('trivial word', max_trivial_word, f)
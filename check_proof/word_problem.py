@@ -9,14 +9,21 @@ at the command line::
 
 and you should see::
 
-    word_problem:TestResults(failed=0, attempted=25)
+    word_problem:TestResults(failed=0, attempted=35)
 
 """
 
 from snappy import Manifold
 from snappy.snap.interval_reps import contains_one, could_be_equal, diameter
 from snappy.snap.polished_reps import SL2C_inverse
-from sage.all import gcd, ZZ
+from sage.all import gcd, ZZ, prod, RealIntervalField, matrix
+
+# The C kernel for interval matrix products from quickdisorder is
+# used at low precision when available.
+try:
+    from quickdisorder.sl2matrix import IntervalMatrix
+except ImportError:
+    IntervalMatrix = None
 
 class WordProblemError(Exception):
     pass
@@ -48,7 +55,47 @@ def is_manifold(manifold):
             return False
     return True
 
-def jorgensens_inequality_fails(A, B):
+def to_interval_matrix(A):
+    """
+    Converts a 2 x 2 matrix over a ComplexIntervalField of precision
+    at most 53 bits, so that all endpoints are exactly doubles, into
+    an IntervalMatrix.
+    """
+    lower, upper = [], []
+    for z in A.list():
+        for x in (z.real(), z.imag()):
+            lower.append(float(x.lower()))
+            upper.append(float(x.upper()))
+    return IntervalMatrix(lower, upper)
+
+def from_interval_matrix(M, CIF):
+    """
+    Converts an IntervalMatrix back into a matrix over the given
+    ComplexIntervalField, rounding outwards as needed.
+    """
+    lower, upper = M.bounds()
+    RIF = RealIntervalField(CIF.prec())
+    entries = [CIF(RIF(lower[i], upper[i]), RIF(lower[i+1], upper[i+1]))
+               for i in range(0, 8, 2)]
+    return matrix(CIF, 2, 2, entries)
+
+def trace_of_product(A, B):
+    """
+    The trace of A*B for 2 x 2 matrices, computed without forming the
+    off-diagonal entries of the product.
+
+    >>> M = Manifold('m004')
+    >>> _, rho = M.verify_hyperbolicity(holonomy=True)
+    >>> A, B = rho('a'), rho('b')
+    >>> (trace_of_product(A, B) - (A*B).trace()).contains_zero()
+    True
+    """
+    return A[0,0]*B[0,0] + A[0,1]*B[1,0] + A[1,0]*B[0,1] + A[1,1]*B[1,1]
+
+def has_det_one(A):
+    return (A.det() - 1).contains_zero()
+
+def jorgensens_inequality_fails(A, B, Binv=None, B_trace_term=None):
     """
     Given two matrices A and B in GL(2, ComplexIntervalField), returns
     whether they provably *fail* Jorgensen's inequality. 
@@ -78,14 +125,32 @@ def jorgensens_inequality_fails(A, B):
     Note that Jorgensen's inequality is not symmetric in A and B, so
     we actually apply both tests, and return True if either of them
     provably fails.
+
+    When the same B is used over and over, its inverse and the
+    quantity |tr(B)^2 - 4| can be passed in rather than recomputed.
+
+    >>> jorgensens_inequality_fails(A, B, SL2C_inverse(B), abs(B.trace()**2 - 4))
+    False
+    >>> jorgensens_inequality_fails(R, A, SL2C_inverse(A), abs(A.trace()**2 - 4))
+    True
     """
     def trace(x):
         return x.trace()
+    def trace_term(x):
+        return abs(trace(x)**2 - 4)
+    assert has_det_one(A)
+    if Binv is None:
+        assert has_det_one(B)
+        Binv = SL2C_inverse(B)
+    if B_trace_term is None:
+        B_trace_term = trace_term(B)
+    first_term = min(trace_term(A), B_trace_term)
+    # The rest of mu is nonnegative, so there is no point forming the
+    # commutator unless first_term is provably less than 1.
+    if not first_term < 1:
+        return False
     Ainv = SL2C_inverse(A)
-    Binv = SL2C_inverse(B)
-    assert contains_one(A*Ainv) and contains_one(B*Binv)
-    first_term = min(abs(trace(A)**2 - 4), abs(trace(B)**2 - 4))
-    mu = first_term + abs(trace(A*B*Ainv*Binv) - 2)
+    mu = first_term + abs(trace_of_product(A*B, Ainv*Binv) - 2)
     return mu < 1
 
 
@@ -104,6 +169,8 @@ class WordProblemSolver(object):
     True
     >>> all(wps.is_trivial(R) for R in wps.rho.relators())
     True
+    >>> could_be_equal(wps.eval_word('aBc'), wps.rho('aBc'))
+    True
 
     We can run into precision issues; in this case the image of R^3 is
     so smeared out we can't tell that it's the identity.
@@ -134,19 +201,97 @@ class WordProblemSolver(object):
             raise WordProblemError("Could not verify the holonomy rep, try increasing precision.")
 
         self.rho = rho
+        gens = rho.generators()
+        self.gen_mats = dict((g, rho(g)) for g in gens)
+        for g in gens:
+            self.gen_mats[g.upper()] = SL2C_inverse(self.gen_mats[g])
+        self.I = rho('')
+        self.use_fast = (IntervalMatrix is not None and
+                         self.I.base_ring().prec() <= 53)
+        if self.use_fast:
+            self._fast_gen_mats = dict((g, to_interval_matrix(A))
+                                       for g, A in self.gen_mats.items())
+            self._fast_I = to_interval_matrix(self.I)
+        self._rho_cache = dict()
+        self._nontrivial_cache = dict()
         self._find_noncommuting_gens()
 
+    def _eval(self, word):
+        """
+        The image of the given word under rho, remembering the answer
+        since the same edge labels turn up over and over again in a
+        nonordering proof tree.
+        """
+        if word in self._rho_cache:
+            return self._rho_cache[word]
+        X = self.eval_word(word)
+        self._rho_cache[word] = X
+        return X
+
+    def clear_caches(self):
+        """
+        Forgets the images and verdicts remembered for individual
+        words, so that a long-lived solver does not keep growing.
+        """
+        self._rho_cache.clear()
+        self._nontrivial_cache.clear()
+
+    def eval_word(self, word):
+        """
+        The image of the given word under rho, computed directly from
+        the stored generator matrices.  Here, word can be any iterable
+        of generators and their inverses.  The product is bracketed
+        just as in rho itself, via Sage's prod.
+        """
+        if self.use_fast:
+            return self.eval_word_fast(word)
+        return prod([self.gen_mats[g] for g in word], self.I)
+
+    def eval_word_fast(self, word):
+        """
+        Same as eval_word, but the products are done by the C kernel
+        behind IntervalMatrix rather than by Sage.  Only available
+        when bits_prec <= 53 and quickdisorder is installed.
+
+        >>> wps = WordProblemSolver(Manifold('m004'), bits_prec=53)
+        >>> wps.use_fast == (IntervalMatrix is not None)
+        True
+        >>> (IntervalMatrix is None or
+        ...  could_be_equal(wps.eval_word_fast('aBab'), wps.rho('aBab')))
+        True
+        """
+        M = prod([self._fast_gen_mats[g] for g in word], self._fast_I)
+        return from_interval_matrix(M, self.I.base_ring())
+
     def _find_noncommuting_gens(self):
         rho = self.rho
         for g, h in pairs(rho.generators()):
             if not contains_one(rho(g + h + (g + h).upper())):
                 self.noncommmuting_gens = (g, h)
-                self.noncommmuting_mats = rho(g), rho(h)
+                A, B = self._eval(g), self._eval(h)
+                assert has_det_one(A) and has_det_one(B)
+                self.noncommmuting_mats = (A, B)
+                self.noncommmuting_inverses = (SL2C_inverse(A), SL2C_inverse(B))
+                self.noncommmuting_trace_terms = (abs(A.trace()**2 - 4),
+                                                  abs(B.trace()**2 - 4))
                 return
         raise WordProblemError("Could not verify a pair of noncommuting gens.")
 
     def is_nontrivial(self, word):
-        X = self.rho(word)
+        if word in self._nontrivial_cache:
+            return self._nontrivial_cache[word]
+        ans = self._is_nontrivial(word)
+        self._nontrivial_cache[word] = ans
+        return ans
+
+    def _is_nontrivial(self, word):
+        return self.is_nontrivial_matrix(self._eval(word))
+
+    def is_nontrivial_matrix(self, X):
+        """
+        Same as is_nontrivial but for a matrix X which is already known
+        to contain the image under rho of some element of the group.
+        """
         if not contains_one(X):
             return True
         # Should be trivial, but we need to prove this. The point is
@@ -154,7 +299,10 @@ class WordProblemSolver(object):
         # Kleinian group.  If <A, X> and <B, X> are both elementary
         # but <A, B> is not, it follows that X must be the identity.
         A, B = self.noncommmuting_mats
-        if jorgensens_inequality_fails(X, A) and jorgensens_inequality_fails(X, B):
+        Ainv, Binv = self.noncommmuting_inverses
+        tA, tB = self.noncommmuting_trace_terms
+        if (jorgensens_inequality_fails(X, A, Ainv, tA) and
+            jorgensens_inequality_fails(X, B, Binv, tB)):
             return False
         raise WordProblemError('Failed to solve the word problem at this precision.')
         
@@ -6,6 +6,14 @@ typedef struct {
     double  imag[2][2];
 }  GL2CMatrix;
 
+/* A 2 x 2 matrix of complex intervals, where the real and imaginary
+   parts of each entry are stored as a midpoint and a radius. */
+
+typedef struct {
+    GL2CMatrix mid;
+    GL2CMatrix rad;
+}  IntervalGL2CMatrix;
+
 extern void copy_GL2C(GL2CMatrix* A, GL2CMatrix* B);
 extern void zero_out_GL2C(GL2CMatrix* A);
 extern void identity_GL2C(GL2CMatrix* A);
@@ -15,3 +23,6 @@ extern void hash_GL2C(GL2CMatrix* A, long* hash, int bits);
 extern void inverse_SL2C(GL2CMatrix* A, GL2CMatrix* B);
 extern double norm_GL2(GL2CMatrix* A);
 extern int is_one(GL2CMatrix* A, int bits);
+extern void bounds_to_interval_GL2C(GL2CMatrix* lower, GL2CMatrix* upper, IntervalGL2CMatrix* A);
+extern void interval_to_bounds_GL2C(IntervalGL2CMatrix* A, GL2CMatrix* lower, GL2CMatrix* upper);
+extern void multiply_interval_GL2C(IntervalGL2CMatrix* A, IntervalGL2CMatrix* B, IntervalGL2CMatrix* C);
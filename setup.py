@@ -11,7 +11,7 @@ headers = ['headers/c', 'headers/cython']
 ext_modules = [Extension(name = 'quickdisorder.sl2matrix',
                          sources = c_code + cython_code,
                          include_dirs = headers,
-                         extra_compile_args = ['-O3'], 
+                         extra_compile_args = ['-O3', '-frounding-math'], 
                      )]
 
 setup(
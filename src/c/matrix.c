@@ -1,4 +1,5 @@
 #include "matrix.h"
+#include <fenv.h>
 
 void copy_GL2C(GL2CMatrix* A, GL2CMatrix* B){
     int i, j;
@@ -109,3 +110,100 @@ int is_one(GL2CMatrix* A, int bits){
 }
 		
 	
+
+/* Rigorous interval arithmetic in midpoint-radius form, following
+   Rump.  Everything below is done with the rounding mode set upward,
+   and lower bounds are computed as -(upper bound of the negation).
+   This requires compiling with -frounding-math so that, e.g., (-a)*b
+   is not rewritten as -(a*b).  */
+
+void bounds_to_interval_GL2C(GL2CMatrix* lower, GL2CMatrix* upper, IntervalGL2CMatrix* A){
+    int i, j, old_mode;
+    double m;
+    old_mode = fegetround();
+    fesetround(FE_UPWARD);
+    for (i=0; i < 2; i++){
+	for (j=0; j < 2; j++){
+	    m = 0.5*(lower->real[i][j] + upper->real[i][j]);
+	    A->mid.real[i][j] = m;
+	    A->rad.real[i][j] = m - lower->real[i][j];
+	    m = 0.5*(lower->imag[i][j] + upper->imag[i][j]);
+	    A->mid.imag[i][j] = m;
+	    A->rad.imag[i][j] = m - lower->imag[i][j];
+	}
+    }
+    fesetround(old_mode);
+}
+
+void interval_to_bounds_GL2C(IntervalGL2CMatrix* A, GL2CMatrix* lower, GL2CMatrix* upper){
+    int i, j, old_mode;
+    old_mode = fegetround();
+    fesetround(FE_UPWARD);
+    for (i=0; i < 2; i++){
+	for (j=0; j < 2; j++){
+	    lower->real[i][j] = -(A->rad.real[i][j] - A->mid.real[i][j]);
+	    upper->real[i][j] = A->mid.real[i][j] + A->rad.real[i][j];
+	    lower->imag[i][j] = -(A->rad.imag[i][j] - A->mid.imag[i][j]);
+	    upper->imag[i][j] = A->mid.imag[i][j] + A->rad.imag[i][j];
+	}
+    }
+    fesetround(old_mode);
+}
+
+/* Encloses the sum of the four products x[t]*y[t] of real intervals.
+   Assumes the rounding mode is upward. */
+
+static void interval_dot4(double* xm, double* xr, double* ym, double* yr,
+			  double* mid, double* rad){
+    int t;
+    double hi, neg_lo, err, c;
+    hi = 0.0;
+    neg_lo = 0.0;
+    err = 0.0;
+    for (t=0; t < 4; t++){
+	hi += xm[t]*ym[t];
+	neg_lo += (-xm[t])*ym[t];
+	err += fabs(xm[t])*yr[t] + xr[t]*(fabs(ym[t]) + yr[t]);
+    }
+    /* The exact sum of the midpoint products lies in [-neg_lo, hi],
+       and c is at least the center of that interval. */
+    c = 0.5*(hi - neg_lo);
+    *mid = c;
+    *rad = (c + neg_lo) + err;
+}
+
+void multiply_interval_GL2C(IntervalGL2CMatrix* A, IntervalGL2CMatrix* B, IntervalGL2CMatrix* C){
+    int i, j, k, old_mode;
+    double xm[4], xr[4], ym[4], yr[4];
+    old_mode = fegetround();
+    fesetround(FE_UPWARD);
+    for (i=0; i < 2; i++){
+	for (j=0; j < 2; j++){
+	    /* Real part: sum over k of Re(A_ik) Re(B_kj) - Im(A_ik) Im(B_kj). */
+	    for (k=0; k < 2; k++){
+		xm[2*k] = A->mid.real[i][k];
+		xr[2*k] = A->rad.real[i][k];
+		ym[2*k] = B->mid.real[k][j];
+		yr[2*k] = B->rad.real[k][j];
+		xm[2*k + 1] = -A->mid.imag[i][k];
+		xr[2*k + 1] = A->rad.imag[i][k];
+		ym[2*k + 1] = B->mid.imag[k][j];
+		yr[2*k + 1] = B->rad.imag[k][j];
+	    }
+	    interval_dot4(xm, xr, ym, yr, &C->mid.real[i][j], &C->rad.real[i][j]);
+	    /* Imaginary part: sum over k of Re(A_ik) Im(B_kj) + Im(A_ik) Re(B_kj). */
+	    for (k=0; k < 2; k++){
+		xm[2*k] = A->mid.real[i][k];
+		xr[2*k] = A->rad.real[i][k];
+		ym[2*k] = B->mid.imag[k][j];
+		yr[2*k] = B->rad.imag[k][j];
+		xm[2*k + 1] = A->mid.imag[i][k];
+		xr[2*k + 1] = A->rad.imag[i][k];
+		ym[2*k + 1] = B->mid.real[k][j];
+		yr[2*k + 1] = B->rad.real[k][j];
+	    }
+	    interval_dot4(xm, xr, ym, yr, &C->mid.imag[i][j], &C->rad.imag[i][j]);
+	}
+    }
+    fesetround(old_mode);
+}
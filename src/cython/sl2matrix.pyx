@@ -16,6 +16,14 @@ cdef extern from "matrix.h":
     double norm_GL2(GL2CMatrix* A)
     int is_one(GL2CMatrix* A, int bits)
 
+    ctypedef struct IntervalGL2CMatrix:
+        GL2CMatrix mid
+        GL2CMatrix rad
+
+    void bounds_to_interval_GL2C(GL2CMatrix* lower, GL2CMatrix* upper, IntervalGL2CMatrix* A)
+    void interval_to_bounds_GL2C(IntervalGL2CMatrix* A, GL2CMatrix* lower, GL2CMatrix* upper)
+    void multiply_interval_GL2C(IntervalGL2CMatrix* A, IntervalGL2CMatrix* B, IntervalGL2CMatrix* C)
+
 
 cdef copy_to_GL2CMatrix(M, GL2CMatrix* N):
     cdef int i, j
@@ -35,6 +43,21 @@ cdef GL2CMatrix_to_array(GL2CMatrix* M):
         ans.append(row)
     return ans
 
+cdef list_to_GL2CMatrix(entries, GL2CMatrix* N):
+    cdef int i, j
+    for i in range(2):
+        for j in range(2):
+            N.real[i][j] = entries[4*i + 2*j]
+            N.imag[i][j] = entries[4*i + 2*j + 1]
+
+cdef GL2CMatrix_to_list(GL2CMatrix* M):
+    cdef int i, j
+    ans = []
+    for i in range(2):
+        for j in range(2):
+            ans += [M.real[i][j], M.imag[i][j]]
+    return ans
+
 cdef class DoubleGroupElement(object):
     cdef GL2CMatrix matrix
     cdef int min_bits_accuracy
@@ -146,3 +169,77 @@ cdef class ProjectiveDoubleGroupElement(DoubleGroupElement):
             return 0
         else:
             return result
+
+cdef class IntervalMatrix(object):
+    """
+    A 2 x 2 matrix of complex intervals, stored in midpoint-radius form
+    with doubles, whose products are computed rigorously using directed
+    rounding.  It is created from, and converted back to, lists of the
+    lower and upper bounds of the entries in the order
+
+    re(a), im(a), re(b), im(b), re(c), im(c), re(d), im(d)
+
+    for the matrix [[a, b], [c, d]].
+
+    The product must contain the product of any two matrices in the
+    factors.  We check this against exact rational arithmetic, using
+    random points in the factors, half of which are point intervals so
+    that the rounding of the midpoints is what is being tested.
+
+    >>> import random
+    >>> from fractions import Fraction
+    >>> def exact_product(x, y):
+    ...     ans = []
+    ...     for i in range(2):
+    ...         for j in range(2):
+    ...             re = im = 0
+    ...             for k in range(2):
+    ...                 a, b = x[4*i + 2*k], x[4*i + 2*k + 1]
+    ...                 c, d = y[4*k + 2*j], y[4*k + 2*j + 1]
+    ...                 re += a*c - b*d
+    ...                 im += a*d + b*c
+    ...             ans += [re, im]
+    ...     return ans
+    >>> def random_point(lower, upper):
+    ...     return [Fraction(l) + Fraction(random.random())*(Fraction(u) - Fraction(l))
+    ...             for l, u in zip(lower, upper)]
+    >>> random.seed(1)
+    >>> encloses = True
+    >>> for trial in range(1000):
+    ...     scale = 10.0**random.randint(-5, 5)
+    ...     factors = []
+    ...     for n in range(2):
+    ...         lower = [random.uniform(-scale, scale) for t in range(8)]
+    ...         radius = random.choice([0.0, 1e-10*scale])
+    ...         factors.append((lower, [l + radius for l in lower]))
+    ...     A, B = [IntervalMatrix(l, u) for l, u in factors]
+    ...     lower, upper = (A*B).bounds()
+    ...     x, y = [random_point(l, u) for l, u in factors]
+    ...     z = exact_product(x, y)
+    ...     encloses = encloses and all(Fraction(l) <= t <= Fraction(u)
+    ...                                 for l, t, u in zip(lower, z, upper))
+    >>> encloses
+    True
+    """
+    cdef IntervalGL2CMatrix matrix
+
+    def __cinit__(self, lower=None, upper=None):
+        cdef GL2CMatrix L, U
+        if lower is not None:
+            list_to_GL2CMatrix(lower, &L)
+            list_to_GL2CMatrix(upper, &U)
+            bounds_to_interval_GL2C(&L, &U, &self.matrix)
+        else:
+            zero_out_GL2C(&self.matrix.mid)
+            zero_out_GL2C(&self.matrix.rad)
+
+    def __mul__(IntervalMatrix self, IntervalMatrix other):
+        cdef IntervalMatrix ans
+        ans = IntervalMatrix()
+        multiply_interval_GL2C(&self.matrix, &other.matrix, &ans.matrix)
+        return ans
+
+    def bounds(self):
+        cdef GL2CMatrix L, U
+        interval_to_bounds_GL2C(&self.matrix, &L, &U)
+        return GL2CMatrix_to_list(&L), GL2CMatrix_to_list(&U)
@@ -1,5 +1,5 @@
 import doctest
-from . import double_group, disorder
+from . import double_group, disorder, sl2matrix
 
-for module in [double_group, disorder]:
+for module in [double_group, disorder, sl2matrix]:
     print(module.__name__ + ': ' + repr(doctest.testmod(module)))